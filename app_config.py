@@ -13,9 +13,12 @@ MURF_API_KEY = os.getenv("MURF_API_KEY")
 ASSEMBLYAI_API_KEY = os.getenv("ASSEMBLYAI_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+# Murf HTTP requests allowed per minute; set this to your Murf plan's limit
+MURF_REQUESTS_PER_MINUTE = float(os.getenv("MURF_REQUESTS_PER_MINUTE", "60"))
+
 # configure APIs and log warnings if keys are missing
 if ASSEMBLYAI_API_KEY:
-    aai.configs.api_key = ASSEMBLYAI_API_KEY
+    aai.settings.api_key = ASSEMBLYAI_API_KEY
 else:
     logging.warning("ASSEMBLYAI_API_KEY not found in .env file.")
 
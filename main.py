@@ -1,20 +1,22 @@
 # main.py
 from fastapi import FastAPI, Request, UploadFile, File, Path, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from typing import Dict, List, Any
+from typing import AsyncIterator, Dict, Iterator, List, Any, Set
 import logging
 import asyncio
-import json
+import time
+import orjson
+import uvicorn
 
 # Import the config file FIRST to load dotenv and configure APIs
 import app_config
-from services import stt, llm, tts, streaming_stt
+from services import stt, llm, tts, streaming_stt, streaming_tts
 from schemas import TTSRequest
 
 # configure logging
-logging.basicconfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 app = FastAPI()
 
@@ -22,9 +24,114 @@ app = FastAPI()
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# Audio returned when a turn cannot be completed.
+FALLBACK_AUDIO_PATH = "static/fallback.mp3"
+
+# Largest audio upload accepted by /agent/chat.
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Largest /ws message; microphone frames are a few KB. Enforced by the server,
+# so pass --ws-max-size when launching uvicorn directly (see README).
+MAX_WS_MESSAGE_BYTES = 1024 * 1024
+
 # In-memory store for chat histories.
 chat_histories: Dict[str, List[Dict[str, Any]]] = {}
 
+# Persistent Murf TTS connections, one per chat session, least recently used first.
+tts_sessions: Dict[str, streaming_tts.StreamingSynthesizer] = {}
+MAX_TTS_SESSIONS = 50
+TTS_IDLE_SECONDS = 300
+
+# Evicted synthesizers still finishing their close handshake.
+closing_synthesizers: Set[asyncio.Task] = set()
+
+
+class UploadSizeLimit:
+    """Rejects oversized /agent/chat uploads from Content-Length before the body is read."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/agent/chat/"):
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+                response = JSONResponse(status_code=413, content={"error": "Audio file is too large."})
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(UploadSizeLimit)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Closes shared upstream clients."""
+    await tts.close_client()
+    for synthesizer in tts_sessions.values():
+        await synthesizer.close()
+    await asyncio.gather(*closing_synthesizers, return_exceptions=True)
+
+
+async def get_synthesizer(session_id: str) -> streaming_tts.StreamingSynthesizer:
+    """Returns the session's Murf synthesizer, closing idle or excess connections."""
+    synthesizer = tts_sessions.pop(session_id, None) or streaming_tts.StreamingSynthesizer()
+    tts_sessions[session_id] = synthesizer
+
+    now = time.monotonic()
+    for other_id, other in list(tts_sessions.items()):
+        if other_id == session_id or other.busy:
+            continue
+        if now - other.last_used > TTS_IDLE_SECONDS or len(tts_sessions) > MAX_TTS_SESSIONS:
+            del tts_sessions[other_id]
+            # Close in the background so a slow handshake never delays this turn
+            task = asyncio.create_task(other.close())
+            closing_synthesizers.add(task)
+            task.add_done_callback(closing_synthesizers.discard)
+    return synthesizer
+
+
+async def prepend_chunk(first_chunk: bytes, chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Yields an already received chunk followed by the rest of the stream."""
+    try:
+        yield first_chunk
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        # Release the synthesizer promptly if the client goes away mid-stream
+        await chunks.aclose()
+
+
+async def stream_llm_text(session_id: str, text_chunks: Iterator[str], chat: Any) -> AsyncIterator[str]:
+    """Yields the LLM reply as it is generated, then saves the session history.
+
+    A reply cut short by Gemini ends the stream early instead of raising, since
+    the audio response has already started.
+    """
+    response_parts = []
+    try:
+        while True:
+            # Each chunk is fetched by the blocking SDK, so read it off the event loop
+            text = await asyncio.to_thread(next, text_chunks, None)
+            if text is None:
+                break
+            response_parts.append(text)
+            yield text
+
+        # Raises BrokenResponseError if the stream stopped for SAFETY or similar
+        chat_histories[session_id] = chat.history
+    except Exception as e:
+        # Blocked chunks raise ValueError on .text; drop the turn from the chat
+        logging.error(f"LLM response failed (session {session_id}): {e}")
+        try:
+            chat.rewind()
+        except Exception as rewind_error:
+            logging.error(f"Could not rewind chat (session {session_id}): {rewind_error}")
+        return
+
+    logging.info(f"LLM Response (session {session_id}): {''.join(response_parts)}")
+
 
 @app.get("/")
 async def home(request: Request):
@@ -39,46 +146,50 @@ async def agent_chat(
 ):
     """
     Handles a turn in the conversation, including history.
-    STT -> Add to History -> LLM -> Add to History -> TTS
+    STT -> LLM (streamed) -> TTS (streamed) -> Add to History
     """
-    fallback_audio_path = "static/fallback.mp3"
+    # Backstop for uploads without a Content-Length (e.g. chunked), checked once spooled
+    if audio_file.size and audio_file.size > MAX_UPLOAD_BYTES:
+        return JSONResponse(status_code=413, content={"error": "Audio file is too large."})
 
     # Check for keys by importing them from the config module
     if not all([app_config.GEMINI_API_KEY, app_config.ASSEMBLYAI_API_KEY, app_config.MURF_API_KEY]):
         logging.warning("One or more API keys are not configured. Returning fallback audio.")
-        return FileResponse(fallback_audio_path, media_type="audio/mpeg", headers={"X-Error": "true"})
+        return FileResponse(FALLBACK_AUDIO_PATH, media_type="audio/mpeg", headers={"X-Error": "true"})
 
     try:
         # Step 1: Transcribe audio to text
-        user_query_text = stt.transcribe_audio(audio_file)
+        async with stt.aai_limiter:
+            user_query_text = await asyncio.to_thread(stt.transcribe_audio, audio_file)
         logging.info(f"User Query (session {session_id}): {user_query_text}")
 
-        # Step 2: Retrieve history and get a response from the LLM
+        # Step 2: Start the LLM response for this session's history
         session_history = chat_histories.get(session_id, [])
-        llm_response_text, updated_history = llm.get_llm_response(user_query_text, session_history)
-        logging.info(f"LLM Response (session {session_id}): {llm_response_text}")
+        text_chunks, chat = await asyncio.to_thread(llm.stream_llm_response, user_query_text, session_history)
 
-        # Step 3: Update the chat history
-        chat_histories[session_id] = updated_history
+        # Step 3: Stream the LLM's reply into TTS as it is generated;
+        # the chat history is updated once the reply is complete
+        synthesizer = await get_synthesizer(session_id)
+        audio_chunks = synthesizer.synthesize(stream_llm_text(session_id, text_chunks, chat))
 
-        # Step 4: Convert the LLM's text response to speech
-        audio_url = tts.convert_text_to_speech(llm_response_text)
+        # Wait for the first audio so TTS failures still get the fallback response
+        try:
+            first_chunk = await audio_chunks.__anext__()
+        except StopAsyncIteration:
+            raise Exception("TTS service did not return any audio.")
 
-        if audio_url:
-            return JSONResponse(content={"audio_url": audio_url})
-        else:
-            raise Exception("TTS service did not return an audio file.")
+        return StreamingResponse(prepend_chunk(first_chunk, audio_chunks), media_type="audio/mpeg")
 
     except Exception as e:
         logging.error(f"An error occurred in session {session_id}: {e}")
-        return FileResponse(fallback_audio_path, media_type="audio/mpeg", headers={"X-Error": "true"})
+        return FileResponse(FALLBACK_AUDIO_PATH, media_type="audio/mpeg", headers={"X-Error": "true"})
 
 
 @app.post("/tts")
 async def tts_endpoint(request: TTSRequest):
     """Endpoint for the simple Text-to-Speech utility."""
     try:
-        audio_url = tts.convert_text_to_speech(request.text, request.voiceId)
+        audio_url = await tts.convert_text_to_speech(request.text, request.voiceId)
         if audio_url:
             return JSONResponse(content={"audio_url": audio_url})
         else:
@@ -91,7 +202,7 @@ async def tts_endpoint(request: TTSRequest):
 async def get_voices():
     """Fetches the list of available voices from Murf AI."""
     try:
-        voices = tts.get_available_voices()
+        voices = await tts.get_available_voices()
         return JSONResponse(content={"voices": voices})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": f"Failed to fetch voices: {e}"})
@@ -104,7 +215,7 @@ async def websocket_endpoint(websocket: WebSocket):
     # Check if AssemblyAI API key is configured
     if not app_config.ASSEMBLYAI_API_KEY:
         logging.error("AssemblyAI API key not configured")
-        await websocket.send_text(json.dumps({"error": "AssemblyAI API key not configured"}))
+        await websocket.send_bytes(orjson.dumps({"error": "AssemblyAI API key not configured"}))
         await websocket.close()
         return
     
@@ -113,26 +224,21 @@ async def websocket_endpoint(websocket: WebSocket):
     
     try:
         # Create streaming transcriber with event handlers
+        # The browser reports its native capture rate
         transcriber = streaming_stt.StreamingTranscriber(
             websocket=websocket,
-            sample_rate=16000  # 16kHz as recommended by AssemblyAI
+            sample_rate=16000,  # 16kHz as recommended by AssemblyAI
+            input_rate=int(websocket.query_params.get("sample_rate", 16000))
         )
         
         # Start the streaming transcription
         await transcriber.start()
         
-        # Handle incoming audio data
-        while True:
-            try:
-                data = await websocket.receive_bytes()
-                # Send audio data to AssemblyAI for transcription
-                await transcriber.send_audio(data)
-            except WebSocketDisconnect:
-                logging.info("WebSocket connection closed by client")
-                break
-            except Exception as e:
-                logging.error(f"Error processing audio data: {e}")
-                break
+        # Handle incoming audio data until the client disconnects
+        async for data in websocket.iter_bytes():
+            # Send audio data to AssemblyAI for transcription
+            await transcriber.send_audio(data)
+        logging.info("WebSocket connection closed by client")
                 
     except WebSocketDisconnect:
         logging.info("WebSocket connection closed")
@@ -142,3 +248,20 @@ async def websocket_endpoint(websocket: WebSocket):
         # Clean up the streaming transcriber
         if transcriber:
             await transcriber.close()
+
+
+if __name__ == "__main__":
+    # "auto" picks uvloop and httptools when installed (uvicorn[standard] skips
+    # uvloop on Windows) and falls back to asyncio and h11 otherwise.
+    # Chat histories and TTS sockets live in process memory, so scale workers
+    # via WEB_CONCURRENCY only behind session-sticky routing.
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="auto",
+        http="auto",
+        ws="websockets",
+        ws_max_size=MAX_WS_MESSAGE_BYTES,
+        ws_ping_interval=20
+    )
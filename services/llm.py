@@ -2,7 +2,8 @@
 
 import google.generativeai as genai
 import os
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Tuple
+from google.generativeai import ChatSession
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
@@ -11,9 +12,14 @@ if GEMINI_API_KEY:
 else:
     print("Warning: GEMINI_API_KEY not found in .env file.")
 
-def get_llm_response(user_query: str, history: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
-    """Gets a response from the Gemini LLM and updates chat history."""
-    model = genai.GenerativeModel('gemini-1.5-flash')
-    chat = model.start_chat(history=history)
-    response = chat.send_message(user_query)
-    return response.text, chat.history
\ No newline at end of file
+# Shared across requests so the SDK reuses its connection
+GEMINI_MODEL = genai.GenerativeModel('gemini-1.5-flash')
+
+def stream_llm_response(user_query: str, history: List[Dict[str, Any]]) -> Tuple[Iterator[str], ChatSession]:
+    """Starts a streaming response from the Gemini LLM.
+
+    The chat's history includes the reply once the text iterator is exhausted.
+    """
+    chat = GEMINI_MODEL.start_chat(history=history)
+    response = chat.send_message(user_query, stream=True)
+    return (chunk.text for chunk in response), chat
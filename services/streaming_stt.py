@@ -1,20 +1,42 @@
 # services/streaming_stt.py
 import asyncio
-import json
+import audioop
 import logging
 import websockets
 import base64
+import time
+import orjson
 from fastapi import WebSocket
-from config import ASSEMBLYAI_API_KEY
+from app_config import ASSEMBLYAI_API_KEY
+from services.vad import VoiceActivityGate
+
+KEEPALIVE_SECONDS = 5  # send a short silence chunk so idle sessions are not dropped
+PARTIAL_INTERVAL_SECONDS = 0.1  # forward at most one partial transcript per window
 
 class StreamingTranscriber:
     """Handles real-time audio transcription using AssemblyAI's streaming API via WebSocket."""
     
-    def __init__(self, websocket: WebSocket, sample_rate: int = 16000):
+    def __init__(self, websocket: WebSocket, sample_rate: int = 16000, input_rate: int = None):
         self.websocket = websocket
         self.sample_rate = sample_rate
+        self.input_rate = input_rate or sample_rate
+        self._rate_state = None
         self.assemblyai_ws = None
         self.running = False
+
+        # Coalesce small browser frames into 200ms PCM16 chunks (AssemblyAI expects 100-500ms)
+        self.chunk_bytes = int(sample_rate * 2 * 0.2)
+        self.min_chunk_bytes = int(sample_rate * 2 * 0.1)
+        self._buffer = bytearray()
+
+        # Silence frames are dropped before they reach AssemblyAI
+        self._vad = VoiceActivityGate(sample_rate)
+        self._last_send_time = time.monotonic()
+
+        # Only the newest partial transcript in each window is forwarded
+        self._last_partial_time = 0.0
+        self._pending_partial = None
+        self._partial_flush = None
         
         # configure AssemblyAI
         if not ASSEMBLYAI_API_KEY:
@@ -44,28 +66,66 @@ class StreamingTranscriber:
             raise
     
     async def send_audio(self, audio_data: bytes):
-        """Send audio data to AssemblyAI for transcription."""
+        """Buffer voiced audio and send it to AssemblyAI in 200ms chunks."""
+        if self.assemblyai_ws and self.running:
+            voiced, utterance_ended = self._vad.process(self._resample(audio_data))
+            self._buffer.extend(voiced)
+
+            if len(self._buffer) >= self.chunk_bytes or (utterance_ended and self._buffer):
+                chunk = bytes(self._buffer).ljust(self.min_chunk_bytes, b"\0")
+                self._buffer.clear()
+                await self._send_chunk(chunk)
+            elif time.monotonic() - self._last_send_time >= KEEPALIVE_SECONDS:
+                await self._send_chunk(bytes(self.min_chunk_bytes))
+
+            if utterance_ended:
+                # Silence is no longer streamed, so ask AssemblyAI to finalize now
+                try:
+                    await self._send_message({"force_end_utterance": True})
+                except Exception as e:
+                    logging.error(f"Error ending utterance: {e}")
+
+    def _resample(self, raw: bytes) -> bytes:
+        """Resample browser PCM16 mono to the session sample rate."""
+        if self.input_rate != self.sample_rate:
+            raw, self._rate_state = audioop.ratecv(
+                raw, 2, 1, self.input_rate, self.sample_rate, self._rate_state
+            )
+        return raw
+
+    async def _send_chunk(self, audio_data: bytes):
+        """Send one chunk of PCM16 audio to AssemblyAI."""
         if self.assemblyai_ws and self.running:
             try:
                 # Convert audio bytes to base64
                 audio_b64 = base64.b64encode(audio_data).decode('utf-8')
                 
                 # Send audio data
-                message = {"audio_data": audio_b64}
-                await self.assemblyai_ws.send(json.dumps(message))
+                await self._send_message({"audio_data": audio_b64})
+                self._last_send_time = time.monotonic()
                 
             except Exception as e:
                 logging.error(f"Error sending audio data: {e}")
+
+    async def _send_message(self, message: dict):
+        """Send a JSON control or audio message to AssemblyAI."""
+        # AssemblyAI expects JSON in text frames
+        await self.assemblyai_ws.send(orjson.dumps(message).decode())
     
     async def close(self):
         """Close the streaming transcription session."""
         if self.assemblyai_ws and self.running:
             try:
+                # Flush buffered audio that is long enough for AssemblyAI to accept
+                if len(self._buffer) >= self.min_chunk_bytes:
+                    await self._send_chunk(bytes(self._buffer))
+                self._buffer.clear()
+                self._cancel_partial()
+
                 self.running = False
                 
                 # Send terminate message
-                terminate_msg = {"terminate_session": True}
-                await self.assemblyai_ws.send(json.dumps(terminate_msg))
+                await self._send_message({"terminate_session": True})
                 
                 # Close WebSocket
                 await self.assemblyai_ws.close()
@@ -82,10 +142,10 @@ class StreamingTranscriber:
                     break
                     
                 try:
-                    data = json.loads(message)
+                    data = orjson.loads(message)
                     await self._handle_transcription_result(data)
                     
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     logging.error(f"Error parsing AssemblyAI message: {e}")
                     
         except Exception as e:
@@ -103,17 +163,15 @@ class StreamingTranscriber:
                 text = data.get("text", "").strip()
                 if text:
                     logging.info(f"🎤 PARTIAL: {text}")
-                    await self._send_to_client({
-                        "type": "transcription",
-                        "text": text,
-                        "is_final": False
-                    })
+                    await self._queue_partial(text)
                     
             elif data.get("message_type") == "FinalTranscript":
                 # Handle final transcripts
                 text = data.get("text", "").strip()
                 if text:
                     logging.info(f"🎤 TRANSCRIPTION: {text}")
+                    # A final transcript supersedes any partial still waiting
+                    self._cancel_partial()
                     await self._send_to_client({
                         "type": "transcription", 
                         "text": text,
@@ -135,10 +193,47 @@ class StreamingTranscriber:
         except Exception as e:
             logging.error(f"Error handling transcription result: {e}")
     
+    async def _queue_partial(self, text: str):
+        """Forward a partial transcript, coalescing bursts within the partial window."""
+        elapsed = time.monotonic() - self._last_partial_time
+        if elapsed >= PARTIAL_INTERVAL_SECONDS and self._partial_flush is None:
+            await self._send_partial(text)
+            return
+
+        self._pending_partial = text
+        if self._partial_flush is None:
+            self._partial_flush = asyncio.create_task(
+                self._flush_partial(max(0.0, PARTIAL_INTERVAL_SECONDS - elapsed))
+            )
+
+    async def _flush_partial(self, delay: float):
+        """Send the newest pending partial once the window has elapsed."""
+        await asyncio.sleep(delay)
+        self._partial_flush = None
+        text, self._pending_partial = self._pending_partial, None
+        if text:
+            await self._send_partial(text)
+
+    async def _send_partial(self, text: str):
+        """Send a partial transcript to the client."""
+        self._last_partial_time = time.monotonic()
+        await self._send_to_client({
+            "type": "transcription",
+            "text": text,
+            "is_final": False
+        })
+
+    def _cancel_partial(self):
+        """Drop any partial transcript waiting to be flushed."""
+        if self._partial_flush:
+            self._partial_flush.cancel()
+            self._partial_flush = None
+        self._pending_partial = None
+
     async def _send_to_client(self, message: dict):
-        """Send a message to the WebSocket client."""
+        """Send a message to the WebSocket client as a binary JSON frame."""
         try:
             if self.websocket:
-                await self.websocket.send_text(json.dumps(message))
+                await self.websocket.send_bytes(orjson.dumps(message))
         except Exception as e:
             logging.error(f"Failed to send message to client: {e}")
\ No newline at end of file
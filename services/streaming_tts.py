@@ -0,0 +1,97 @@
+# services/streaming_tts.py
+import asyncio
+import base64
+import json
+import logging
+import time
+import uuid
+import websockets
+from typing import AsyncIterator
+from app_config import MURF_API_KEY
+
+MURF_WS_URL = "wss://api.murf.ai/v1/speech/stream-input"
+RECEIVE_TIMEOUT_SECONDS = 15  # longest wait for the next Murf frame before giving up
+
+class StreamingSynthesizer:
+    """Keeps a persistent WebSocket to Murf AI's streaming TTS for one chat session."""
+
+    def __init__(self, voice_id: str = "en-US-natalie", sample_rate: int = 44100):
+        self.voice_id = voice_id
+        self.sample_rate = sample_rate
+        self.murf_ws = None
+        self.last_used = time.monotonic()
+        self._lock = asyncio.Lock()
+
+        if not MURF_API_KEY:
+            raise Exception("Murf API key not configured")
+
+    @property
+    def busy(self) -> bool:
+        """Whether a turn is currently being synthesized."""
+        return self._lock.locked()
+
+    async def connect(self):
+        """Open the Murf WebSocket if it is not already open; call with the lock held."""
+        if self.murf_ws and self.murf_ws.open:
+            return
+
+        url = (
+            f"{MURF_WS_URL}?api-key={MURF_API_KEY}"
+            f"&sample_rate={self.sample_rate}&channel_type=MONO&format=MP3"
+        )
+        self.murf_ws = await websockets.connect(url, ping_interval=20, ping_timeout=20)
+        await self.murf_ws.send(json.dumps({"voice_config": {"voiceId": self.voice_id}}))
+        logging.info("Connected to Murf streaming TTS")
+
+    async def synthesize(self, text_chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """Stream text over the persistent connection and yield MP3 audio chunks."""
+        async with self._lock:
+            await self.connect()
+            context_id = uuid.uuid4().hex
+            completed = False
+            sender = asyncio.create_task(self._send_text(context_id, text_chunks))
+            try:
+                while True:
+                    message = await asyncio.wait_for(self.murf_ws.recv(), RECEIVE_TIMEOUT_SECONDS)
+                    data = json.loads(message)
+                    if "error" in data:
+                        raise Exception(f"Murf TTS error: {data['error']}")
+                    if "audio" in data:
+                        yield base64.b64decode(data["audio"])
+                    if data.get("final"):
+                        completed = True
+                        break
+                # Surface any error raised while producing the text
+                await sender
+            finally:
+                if not sender.done():
+                    sender.cancel()
+                    await asyncio.gather(sender, return_exceptions=True)
+                # An abandoned turn leaves audio frames in flight; drop the socket
+                # so the next turn does not read them.
+                if not completed:
+                    await self.close()
+                self.last_used = time.monotonic()
+
+    async def _send_text(self, context_id: str, text_chunks: AsyncIterator[str]):
+        """Forward each piece of text to Murf as soon as it arrives."""
+        try:
+            async for text in text_chunks:
+                await self.murf_ws.send(json.dumps({"context_id": context_id, "text": text}))
+        finally:
+            # Let Murf finish whatever text it already has, even if the producer failed
+            await self.murf_ws.send(json.dumps({"context_id": context_id, "text": "", "end": True}))
+
+    async def close(self):
+        """Close the Murf WebSocket."""
+        murf_ws = self.murf_ws
+        if murf_ws:
+            try:
+                await murf_ws.close()
+                logging.info("Murf streaming TTS closed")
+            except Exception as e:
+                logging.error(f"Error closing Murf TTS connection: {e}")
+            finally:
+                # Leave a socket opened while this one was closing alone
+                if self.murf_ws is murf_ws:
+                    self.murf_ws = None
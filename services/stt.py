@@ -1,7 +1,14 @@
 # services/stt.py
 import assemblyai as aai
+from aiolimiter import AsyncLimiter
 from fastapi import UploadFile
 
+# Limits transcriptions, not raw requests. AssemblyAI allows 20,000 requests per
+# 5 minutes, and each transcription makes an upload, a submit and repeated status
+# polls, so budget ten requests per transcription in a one-second bucket.
+REQUESTS_PER_TRANSCRIPTION = 10
+aai_limiter = AsyncLimiter(20000 / 300 / REQUESTS_PER_TRANSCRIPTION, 1)
+
 def transcribe_audio(audio_file: UploadFile) -> str:
     """Transcribes audio to text using AssemblyAI."""
     transcriber = aai.Transcriber()
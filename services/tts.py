@@ -1,11 +1,39 @@
 # services/tts.py
-import requests
+import asyncio
+import random
+import httpx
+from aiolimiter import AsyncLimiter
 from typing import List, Dict, Any
-from config import MURF_API_KEY # Import the key from config
+from app_config import MURF_API_KEY, MURF_REQUESTS_PER_MINUTE # Import the key from config
 
 MURF_API_URL = "https://api.murf.ai/v1/speech"
 
-def convert_text_to_speech(text: str, voice_id: str = "en-US-natalie") -> str:
+# Shared client so every Murf call reuses pooled keep-alive connections
+murf_client = httpx.AsyncClient(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=20)
+)
+
+# Smooth bursts to the configured request rate and back off when Murf still says 429
+murf_limiter = AsyncLimiter(MURF_REQUESTS_PER_MINUTE, 60)
+RETRY_DELAYS = [1, 5, 15]
+
+async def _murf_request(method: str, url: str, **kwargs) -> httpx.Response:
+    """Sends a rate-limited Murf request, retrying 429 responses with jittered backoff.
+
+    Other errors are not retried: synthesis is billed per character and not idempotent.
+    """
+    for delay in RETRY_DELAYS + [None]:
+        async with murf_limiter:
+            response = await murf_client.request(method, url, **kwargs)
+        if delay is None or response.status_code != 429:
+            break
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+    response.raise_for_status()
+    return response
+
+async def convert_text_to_speech(text: str, voice_id: str = "en-US-natalie") -> str:
     """Converts text to speech using Murf AI."""
     if not MURF_API_KEY:
         raise Exception("MURF_API_KEY not configured.")
@@ -17,17 +45,19 @@ def convert_text_to_speech(text: str, voice_id: str = "en-US-natalie") -> str:
         "format": "MP3",
         "volume": "100%"
     }
-    response = requests.post(f"{MURF_API_URL}/generate", json=payload, headers=headers)
-    response.raise_for_status()
+    response = await _murf_request("POST", f"{MURF_API_URL}/generate", json=payload, headers=headers)
     response_data = response.json()
     return response_data.get("audioFile")
 
-def get_available_voices() -> List[Dict[str, Any]]:
+async def get_available_voices() -> List[Dict[str, Any]]:
     """Fetches the list of available voices from Murf AI."""
     if not MURF_API_KEY:
         raise Exception("MURF_API_KEY not configured.")
 
     headers = {"Accept": "application/json", "api-key": MURF_API_KEY}
-    response = requests.get(f"{MURF_API_URL}/voices", headers=headers)
-    response.raise_for_status()
-    return response.json()
\ No newline at end of file
+    response = await _murf_request("GET", f"{MURF_API_URL}/voices", headers=headers)
+    return response.json()
+
+async def close_client():
+    """Closes the shared Murf HTTP client."""
+    await murf_client.aclose()
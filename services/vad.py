@@ -0,0 +1,63 @@
+# services/vad.py
+import numpy as np
+from collections import deque
+from typing import Tuple
+
+class VoiceActivityGate:
+    """Drops silent PCM16 frames, keeping a short preroll and hangover around speech.
+
+    Speech is any frame sufficiently louder than an adaptive noise floor. The floor
+    drops straight to quieter frames and creeps up slowly otherwise, so steady
+    background noise is learned while quiet speakers still clear it.
+    """
+
+    def __init__(self, sample_rate: int = 16000, frame_ms: int = 30,
+                 preroll_ms: int = 300, hangover_ms: int = 300,
+                 speech_margin_db: float = 9.0, floor_rise_db_per_s: float = 3.0,
+                 min_rms: float = 10.0):
+        self.frame_bytes = int(sample_rate * 2 * frame_ms / 1000)
+        self.hangover_frames = hangover_ms // frame_ms
+        self.speech_ratio = 10 ** (speech_margin_db / 20)
+        self.floor_rise = 10 ** (floor_rise_db_per_s * frame_ms / 1000 / 20)
+        self.min_rms = min_rms  # below this (about -70 dBFS) a frame is digital silence
+        self.noise_floor = min_rms
+        self.in_speech = False
+        self._pending = bytearray()
+        self._preroll = deque(maxlen=preroll_ms // frame_ms)
+        self._silence_frames = 0
+
+    def process(self, pcm: bytes) -> Tuple[bytes, bool]:
+        """Return the voiced audio in pcm and whether an utterance just ended."""
+        self._pending.extend(pcm)
+        voiced = bytearray()
+        utterance_ended = False
+
+        while len(self._pending) >= self.frame_bytes:
+            frame = bytes(self._pending[:self.frame_bytes])
+            del self._pending[:self.frame_bytes]
+
+            if self._is_speech(frame):
+                if not self.in_speech:
+                    voiced.extend(b"".join(self._preroll))
+                    self._preroll.clear()
+                    self.in_speech = True
+                self._silence_frames = 0
+                voiced.extend(frame)
+            elif self.in_speech:
+                voiced.extend(frame)
+                self._silence_frames += 1
+                if self._silence_frames >= self.hangover_frames:
+                    self.in_speech = False
+                    utterance_ended = True
+            else:
+                self._preroll.append(frame)
+
+        return bytes(voiced), utterance_ended
+
+    def _is_speech(self, frame: bytes) -> bool:
+        """Classify one frame and update the noise floor."""
+        samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+        rms = float(np.sqrt(np.mean(samples * samples)))
+        is_speech = rms >= self.min_rms and rms >= self.noise_floor * self.speech_ratio
+        self.noise_floor = max(self.min_rms, min(rms, self.noise_floor * self.floor_rise))
+        return is_speech
@@ -30,62 +30,84 @@ document.addEventListener("DOMContentLoaded", async () => {
         recordBtn.classList.add("recording");
         statusDisplay.textContent = "Recording... Press the button to stop.";
 
+        let stream = null;
+        let source = null;
+        try {
+            stream = await navigator.mediaDevices.getUserMedia({
+                audio: {
+                    sampleRate: 16000,
+                    channelCount: 1,
+                    echoCancellation: true,
+                    noiseSuppression: true
+                }
+            });
+
+            // Prefer a 16kHz context so the browser resamples and upstream stays at 32KB/s;
+            // browsers that cannot mix sample rates fall back to the native rate,
+            // which the server resamples instead
+            try {
+                audioContext = new AudioContext({ sampleRate: 16000 });
+                source = audioContext.createMediaStreamSource(stream);
+            } catch (rateErr) {
+                audioContext?.close();
+                audioContext = new AudioContext();
+                source = audioContext.createMediaStreamSource(stream);
+            }
+        } catch (err) {
+            console.error("Error accessing mic:", err);
+            alert("Could not access microphone. Please check permissions.");
+            stream?.getTracks().forEach((track) => track.stop());
+            audioContext?.close();
+            audioContext = null;
+            socket?.close();
+            socket = null;
+            isRecording = false;
+            recordBtn.classList.remove("recording");
+            statusDisplay.textContent = "Ready to chat!";
+            return;
+        }
+
         // Establish WebSocket connection
         const wsProtocol = window.location.protocol === "https:" ? "wss:" : "ws:";
-        socket = new WebSocket(`${wsProtocol}//${window.location.host}/ws`);
+        socket = new WebSocket(
+            `${wsProtocol}//${window.location.host}/ws?sample_rate=${audioContext.sampleRate}`
+        );
 
-        socket.onopen = async () => {
+        // Transcripts arrive as binary UTF-8 JSON frames
+        socket.binaryType = "arraybuffer";
+        const decoder = new TextDecoder();
+
+        socket.onopen = () => {
             console.log("WebSocket connection established.");
-            try {
-                const stream = await navigator.mediaDevices.getUserMedia({
-                    audio: {
-                        sampleRate: 16000,
-                        channelCount: 1,
-                        echoCancellation: true,
-                        noiseSuppression: true
-                    }
-                });
 
-                // Create AudioContext for processing audio to PCM format
-                audioContext = new AudioContext({ sampleRate: 16000 });
-                const source = audioContext.createMediaStreamSource(stream);
-                
-                // Create ScriptProcessorNode for audio processing
-                processor = audioContext.createScriptProcessor(4096, 1, 1);
-                
-                processor.onaudioprocess = (event) => {
-                    if (socket && socket.readyState === WebSocket.OPEN) {
-                        const inputData = event.inputBuffer.getChannelData(0);
-                        
-                        // Convert float32 audio data to 16-bit PCM
-                        const pcmData = new Int16Array(inputData.length);
-                        for (let i = 0; i < inputData.length; i++) {
-                            // Clamp the value to prevent distortion
-                            const sample = Math.max(-1, Math.min(1, inputData[i]));
-                            pcmData[i] = sample * 32767;
-                        }
-                        
-                        // Send PCM data as bytes
-                        socket.send(pcmData.buffer);
+            // Create ScriptProcessorNode for audio processing
+            processor = audioContext.createScriptProcessor(4096, 1, 1);
+            
+            processor.onaudioprocess = (event) => {
+                if (socket && socket.readyState === WebSocket.OPEN) {
+                    const inputData = event.inputBuffer.getChannelData(0);
+                    
+                    // Convert float32 audio data to 16-bit PCM
+                    const pcmData = new Int16Array(inputData.length);
+                    for (let i = 0; i < inputData.length; i++) {
+                        // Clamp the value to prevent distortion
+                        const sample = Math.max(-1, Math.min(1, inputData[i]));
+                        pcmData[i] = sample * 32767;
                     }
-                };
-                
-                // Connect the audio processing chain
-                source.connect(processor);
-                processor.connect(audioContext.destination);
-
-            } catch (err) {
-                console.error("Error accessing mic:", err);
-                alert("Could not access microphone. Please check permissions.");
-                isRecording = false;
-                recordBtn.classList.remove("recording");
-                statusDisplay.textContent = "Ready to chat!";
-            }
+                    
+                    // Send PCM data as bytes
+                    socket.send(pcmData.buffer);
+                }
+            };
+            
+            // Connect the audio processing chain
+            source.connect(processor);
+            processor.connect(audioContext.destination);
         };
 
         socket.onmessage = (event) => {
             try {
-                const message = JSON.parse(event.data);
+                const message = JSON.parse(decoder.decode(event.data));
                 
                 if (message.type === "transcription") {
                     // Display transcription in console and UI
@@ -0,0 +1,16 @@
+"""PCM16 test signals in 30ms frames at 16kHz."""
+import numpy as np
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = SAMPLE_RATE * 30 // 1000
+
+
+def tone(frames: int, dbfs: float) -> bytes:
+    """A 440Hz sine whose peak sits at the given level."""
+    t = np.arange(frames * FRAME_SAMPLES) / SAMPLE_RATE
+    amplitude = 32767 * 10 ** (dbfs / 20)
+    return (amplitude * np.sin(2 * np.pi * 440 * t)).astype(np.int16).tobytes()
+
+
+def silence(frames: int) -> bytes:
+    return bytes(frames * FRAME_SAMPLES * 2)
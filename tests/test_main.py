@@ -0,0 +1,121 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app_config
+import main
+from services import llm, streaming_tts, stt
+
+
+class FakeChat:
+    history = ["user turn", "model turn"]
+
+    def rewind(self):
+        pass
+
+
+class FakeSynthesizer:
+    """Stands in for the Murf WebSocket, echoing the text it is given as audio."""
+
+    def __init__(self):
+        self.busy = False
+        self.last_used = 0.0
+
+    async def synthesize(self, text_chunks):
+        async for text in text_chunks:
+            yield f"audio:{text}".encode()
+
+    async def close(self):
+        pass
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    for key in ("GEMINI_API_KEY", "ASSEMBLYAI_API_KEY", "MURF_API_KEY"):
+        monkeypatch.setattr(app_config, key, "test-key")
+    fallback = tmp_path / "fallback.mp3"
+    fallback.write_bytes(b"fallback-audio")
+    monkeypatch.setattr(main, "FALLBACK_AUDIO_PATH", str(fallback))
+    monkeypatch.setattr(main, "chat_histories", {})
+    monkeypatch.setattr(main, "tts_sessions", {})
+    monkeypatch.setattr(streaming_tts, "StreamingSynthesizer", FakeSynthesizer)
+    return TestClient(main.app)
+
+
+def multipart_body(payload: bytes):
+    boundary = "testboundary"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="audio_file"; filename="turn.webm"\r\n'
+        "Content-Type: audio/webm\r\n\r\n"
+    ).encode() + payload + f"\r\n--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def test_streamed_turn(client, monkeypatch):
+    monkeypatch.setattr(stt, "transcribe_audio", lambda audio_file: "Hello there")
+    monkeypatch.setattr(llm, "stream_llm_response", lambda query, history: (iter(["Hi ", "you."]), FakeChat()))
+
+    response = client.post("/agent/chat/abc", files={"audio_file": ("turn.webm", b"audio")})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.content == b"audio:Hi audio:you."
+    assert main.chat_histories["abc"] == FakeChat.history
+
+
+def test_failed_turn_returns_fallback(client, monkeypatch):
+    def fail(audio_file):
+        raise Exception("Transcription failed")
+
+    monkeypatch.setattr(stt, "transcribe_audio", fail)
+
+    response = client.post("/agent/chat/abc", files={"audio_file": ("turn.webm", b"audio")})
+
+    assert response.status_code == 200
+    assert response.headers["x-error"] == "true"
+    assert response.content == b"fallback-audio"
+
+
+def test_oversized_upload_rejected_by_content_length(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 1024)
+    body, content_type = multipart_body(b"x" * 2048)
+
+    response = client.post("/agent/chat/abc", content=body, headers={"content-type": content_type})
+
+    assert response.status_code == 413
+
+
+def test_oversized_chunked_upload_rejected_after_spooling(client, monkeypatch):
+    monkeypatch.setattr(main, "MAX_UPLOAD_BYTES", 1024)
+    body, content_type = multipart_body(b"x" * 2048)
+
+    # A streamed body is sent chunked, without a Content-Length header
+    response = client.post("/agent/chat/abc", content=iter([body]), headers={"content-type": content_type})
+
+    assert response.status_code == 413
+
+
+def test_idle_synthesizer_closed_without_blocking_turn(monkeypatch):
+    monkeypatch.setattr(streaming_tts, "StreamingSynthesizer", FakeSynthesizer)
+    monkeypatch.setattr(main, "tts_sessions", {})
+    closed = []
+
+    class HangingSynthesizer(FakeSynthesizer):
+        async def close(self):
+            closed.append(self)
+            await asyncio.sleep(3600)  # an unresponsive close handshake
+
+    async def turn():
+        idle = HangingSynthesizer()
+        idle.last_used = time.monotonic() - main.TTS_IDLE_SECONDS - 1
+        main.tts_sessions["idle"] = idle
+        synthesizer = await asyncio.wait_for(main.get_synthesizer("abc"), timeout=1)
+        await asyncio.sleep(0)
+        assert closed == [idle]
+        return synthesizer
+
+    synthesizer = asyncio.run(turn())
+    assert main.tts_sessions == {"abc": synthesizer}
@@ -0,0 +1,115 @@
+import asyncio
+import base64
+import json
+
+from services import streaming_stt
+from tests.audio import silence, tone
+
+
+class FakeAssemblyAI:
+    """Records messages the transcriber sends upstream."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send(self, message):
+        self.messages.append(json.loads(message))
+
+
+def make_transcriber(monkeypatch):
+    monkeypatch.setattr(streaming_stt, "ASSEMBLYAI_API_KEY", "test-key")
+    transcriber = streaming_stt.StreamingTranscriber(websocket=None)
+    transcriber.assemblyai_ws = FakeAssemblyAI()
+    transcriber.running = True
+    return transcriber
+
+
+def sent_audio(messages):
+    return b"".join(base64.b64decode(m["audio_data"]) for m in messages if "audio_data" in m)
+
+
+def test_utterance_end_flushes_audio_and_forces_end(monkeypatch):
+    transcriber = make_transcriber(monkeypatch)
+    speech = tone(20, -40)
+
+    asyncio.run(transcriber.send_audio(silence(20)))
+    assert transcriber.assemblyai_ws.messages == []
+
+    asyncio.run(transcriber.send_audio(speech))
+    asyncio.run(transcriber.send_audio(silence(20)))
+
+    messages = transcriber.assemblyai_ws.messages
+    assert messages[-1] == {"force_end_utterance": True}
+    assert [m for m in messages if "force_end_utterance" in m] == [messages[-1]]
+
+    # Preroll, speech and hangover all reach AssemblyAI; the last chunk may be zero-padded
+    expected = silence(10) + speech + silence(10)
+    audio = sent_audio(messages)
+    assert audio[:len(expected)] == expected
+    assert audio[len(expected):].count(0) == len(audio) - len(expected)
+
+
+def test_silence_between_utterances_is_not_sent(monkeypatch):
+    transcriber = make_transcriber(monkeypatch)
+
+    asyncio.run(transcriber.send_audio(tone(10, -30) + silence(10)))
+    sent = len(transcriber.assemblyai_ws.messages)
+
+    asyncio.run(transcriber.send_audio(silence(50)))
+    assert len(transcriber.assemblyai_ws.messages) == sent
+
+
+class FakeClient:
+    """Records transcript frames sent to the browser."""
+
+    def __init__(self):
+        self.messages = []
+
+    async def send_bytes(self, data):
+        self.messages.append(json.loads(data))
+
+
+def make_client_transcriber(monkeypatch):
+    monkeypatch.setattr(streaming_stt, "ASSEMBLYAI_API_KEY", "test-key")
+    return streaming_stt.StreamingTranscriber(websocket=FakeClient())
+
+
+def partial(text):
+    return {"message_type": "PartialTranscript", "text": text}
+
+
+def final(text):
+    return {"message_type": "FinalTranscript", "text": text}
+
+
+def test_partial_burst_forwards_only_newest(monkeypatch):
+    transcriber = make_client_transcriber(monkeypatch)
+
+    async def burst():
+        for text in ("how", "how are", "how are you"):
+            await transcriber._handle_transcription_result(partial(text))
+        await asyncio.sleep(streaming_stt.PARTIAL_INTERVAL_SECONDS * 2)
+
+    asyncio.run(burst())
+
+    assert [(m["text"], m["is_final"]) for m in transcriber.websocket.messages] == [
+        ("how", False),
+        ("how are you", False),
+    ]
+
+
+def test_final_cancels_held_partial(monkeypatch):
+    transcriber = make_client_transcriber(monkeypatch)
+
+    async def utterance():
+        await transcriber._handle_transcription_result(partial("how"))
+        await transcriber._handle_transcription_result(partial("how are"))
+        await transcriber._handle_transcription_result(final("How are you?"))
+        await asyncio.sleep(streaming_stt.PARTIAL_INTERVAL_SECONDS * 2)
+
+    asyncio.run(utterance())
+
+    assert [(m["text"], m["is_final"]) for m in transcriber.websocket.messages] == [
+        ("how", False),
+        ("How are you?", True),
+    ]
@@ -0,0 +1,54 @@
+import asyncio
+import base64
+import json
+
+from services import streaming_tts
+
+
+class FakeMurf:
+    """Replies with one audio frame once the context is ended."""
+
+    def __init__(self):
+        self.sent = []
+        self.open = True
+        self._replies = asyncio.Queue()
+
+    async def send(self, message):
+        data = json.loads(message)
+        self.sent.append(data)
+        if data.get("end"):
+            await self._replies.put(json.dumps({"audio": base64.b64encode(b"mp3").decode()}))
+            await self._replies.put(json.dumps({"final": True}))
+
+    async def recv(self):
+        return await self._replies.get()
+
+    async def close(self):
+        self.open = False
+
+
+def test_text_is_forwarded_as_soon_as_it_arrives(monkeypatch):
+    monkeypatch.setattr(streaming_tts, "MURF_API_KEY", "test-key")
+
+    async def turn():
+        murf = FakeMurf()
+        synthesizer = streaming_tts.StreamingSynthesizer()
+        synthesizer.murf_ws = murf
+        sent_before_second_chunk = []
+
+        async def llm_text():
+            yield "Hi "
+            await asyncio.sleep(0.05)  # Gemini is still producing the next chunk
+            sent_before_second_chunk.extend(m.get("text") for m in murf.sent)
+            yield "there."
+
+        audio = [chunk async for chunk in synthesizer.synthesize(llm_text())]
+        return murf, sent_before_second_chunk, audio
+
+    murf, sent_before_second_chunk, audio = asyncio.run(turn())
+
+    assert sent_before_second_chunk == ["Hi "]
+    assert [m["text"] for m in murf.sent] == ["Hi ", "there.", ""]
+    assert murf.sent[-1]["end"] is True
+    assert len({m["context_id"] for m in murf.sent}) == 1
+    assert audio == [b"mp3"]
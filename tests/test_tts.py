@@ -0,0 +1,48 @@
+import asyncio
+
+import httpx
+import pytest
+from aiolimiter import AsyncLimiter
+
+from services import tts
+
+
+def use_fake_murf(monkeypatch, statuses):
+    """Routes Murf calls to a transport answering with the given status codes in turn."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(statuses[len(calls) - 1], json={"audioFile": "https://murf/audio.mp3"})
+
+    monkeypatch.setattr(tts, "murf_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    monkeypatch.setattr(tts, "murf_limiter", AsyncLimiter(1000, 1))
+    monkeypatch.setattr(tts, "RETRY_DELAYS", [0, 0, 0])
+    return calls
+
+
+def test_rate_limited_request_is_retried(monkeypatch):
+    calls = use_fake_murf(monkeypatch, [429, 429, 200])
+
+    response = asyncio.run(tts._murf_request("POST", f"{tts.MURF_API_URL}/generate", json={}))
+
+    assert response.status_code == 200
+    assert len(calls) == 3
+
+
+def test_rate_limit_gives_up_after_all_retries(monkeypatch):
+    calls = use_fake_murf(monkeypatch, [429, 429, 429, 429])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(tts._murf_request("POST", f"{tts.MURF_API_URL}/generate", json={}))
+
+    assert len(calls) == 4
+
+
+def test_server_error_is_not_retried(monkeypatch):
+    calls = use_fake_murf(monkeypatch, [503, 200])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(tts._murf_request("POST", f"{tts.MURF_API_URL}/generate", json={}))
+
+    assert len(calls) == 1
@@ -0,0 +1,49 @@
+from services.vad import VoiceActivityGate
+from tests.audio import FRAME_SAMPLES, SAMPLE_RATE, silence, tone
+
+
+def test_quiet_speech_passes_gate():
+    gate = VoiceActivityGate(SAMPLE_RATE)
+    voiced, _ = gate.process(silence(20) + tone(20, -40))
+    assert len(voiced) > 0
+
+
+def test_silence_is_dropped():
+    gate = VoiceActivityGate(SAMPLE_RATE)
+    voiced, ended = gate.process(silence(50))
+    assert voiced == b""
+    assert not ended
+
+
+def test_preroll_and_hangover_surround_speech():
+    gate = VoiceActivityGate(SAMPLE_RATE)
+    frame_bytes = FRAME_SAMPLES * 2
+    lead_in = tone(5, -70)  # audible floor noise before the speaker starts
+    speech = tone(10, -30)
+
+    voiced, ended = gate.process(silence(10) + lead_in + speech)
+    assert not ended
+    # The preroll keeps the last 300ms (10 frames) before speech, ending with the lead-in
+    assert voiced.startswith(silence(5) + lead_in)
+    assert voiced.endswith(speech)
+    assert len(voiced) == 10 * frame_bytes + len(speech)
+
+    # Silence after speech is kept until the 300ms hangover ends the utterance
+    voiced, ended = gate.process(silence(9))
+    assert voiced == silence(9)
+    assert not ended
+
+    voiced, ended = gate.process(silence(1))
+    assert voiced == silence(1)
+    assert ended
+
+    voiced, ended = gate.process(silence(5))
+    assert voiced == b""
+    assert not ended
+
+
+def test_steady_noise_is_learned():
+    gate = VoiceActivityGate(SAMPLE_RATE)
+    gate.process(tone(400, -40))  # 12s of unchanging background hum
+    voiced, _ = gate.process(tone(10, -40))
+    assert voiced == b""